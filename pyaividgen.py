@@ -1,159 +1,494 @@
 import argparse
+import asyncio
 import os
-import json
+import hashlib
+import orjson
+import re
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 import shutil
-from openai import OpenAI
+import base64
+import aiofiles
+import openai
+from tenacity import retry, wait_random_exponential, stop_after_attempt, retry_if_exception_type
+import functools
+from pathlib import Path
 import colorama
 from colorama import Fore, Style
-from dotenv import load_dotenv
-from moviepy.editor import ImageClip, concatenate_audioclips, concatenate_videoclips, AudioFileClip, CompositeAudioClip, AudioClip
-
-from youtube_uploader import upload_video
+from tqdm import tqdm
 
 colorama.init(autoreset=True)
-load_dotenv()
-
-openai_api_key = os.getenv("OPENAI_API_KEY")
-if not openai_api_key:
-    print("Error: OpenAI API key not found. Please check your .env file.")
-    exit(1)
 
-client = OpenAI(api_key=openai_api_key)
+# Clients, settings and caches are constructed lazily so that invocations
+# which never reach the network (e.g. --help) pay no import or TLS setup cost.
+@functools.lru_cache(maxsize=1)
+def get_openai_api_key():
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    openai_api_key = os.getenv("OPENAI_API_KEY")
+    if not openai_api_key:
+        print("Error: OpenAI API key not found. Please check your .env file.")
+        exit(1)
+    return openai_api_key
+
+@functools.lru_cache(maxsize=1)
+def get_client():
+    from openai import OpenAI
+    return OpenAI(api_key=get_openai_api_key())
+
+@functools.lru_cache(maxsize=1)
+def get_aclient():
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=get_openai_api_key())
+
+# Local cache for LLM responses: re-running with an unchanged user message
+# or meditation text returns the previous answer at zero latency and cost
+@functools.lru_cache(maxsize=1)
+def get_prompt_cache():
+    import diskcache
+    return diskcache.Cache(os.path.expanduser("~/.pyaividgen/cache"))
+
+def cache_key(model, messages, **params):
+    payload = orjson.dumps({"model": model, "messages": messages, "params": params}, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(payload).hexdigest()
+
+# Shared HTTP session so downloads reuse pooled keep-alive connections
+# instead of paying a fresh TCP+TLS handshake per request
+@functools.lru_cache(maxsize=1)
+def get_http_session():
+    http_session = requests.Session()
+    http_session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+    return http_session
 
 def print_green_bold(text):
     print(Fore.GREEN + Style.BRIGHT + text + Style.RESET_ALL)
 
+# System messages are constant, so build them once instead of allocating the
+# same dicts on every call
+TEXT_SYSTEM_MESSAGE = {"role": "system", "content": "You are a helpful assistant which is able to generate guided meditations as text."}
+PROMPT_SYSTEM_MESSAGE = {"role": "system", "content": "You are a helpful assistant who is able to generate perfect DallE 3 image generation prompts. Those prompts should be perfect for generating images to accompany the spoken text in a video. Images must not contain any humans or animals. Images must also not contain any writing. Please only output the prompt for the text the user is providing. Please do not include any further instructions or explainations in your answer, only the prompt text."}
+VIDEO_DETAILS_SYSTEM_MESSAGE = {"role": "system", "content": "You are an assistant which is able to generate for a given text of a YouTube video great seo-optimized and engaging video title (title), video description (description) and keywords (keywords). Please output in JSON format only."}
+
+# Retry transient API and network failures with exponential backoff instead of
+# aborting a whole run on a single 429/500 or dropped connection.
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    requests.exceptions.RequestException,
+)
+
+retry_on_transient_errors = retry(
+    wait=wait_random_exponential(min=1, max=60),
+    stop=stop_after_attempt(6),
+    retry=retry_if_exception_type(RETRYABLE_ERRORS),
+)
+
+@retry_on_transient_errors
+def create_chat_completion(**kwargs):
+    return get_client().chat.completions.create(**kwargs)
+
+@retry_on_transient_errors
+async def acreate_chat_completion(**kwargs):
+    async with get_rpm_limiter():
+        await get_tpm_limiter().acquire(estimate_tokens(kwargs.get("messages", [])))
+        return await get_aclient().chat.completions.create(**kwargs)
+
+@retry_on_transient_errors
+async def agenerate_image(**kwargs):
+    async with get_rpm_limiter():
+        return await get_aclient().images.generate(**kwargs)
+
+@retry_on_transient_errors
+async def acreate_speech(output_file, **kwargs):
+    # Stream the audio chunks to disk as they arrive instead of buffering
+    # the whole MP3 response body in memory first
+    async with get_rpm_limiter():
+        async with get_aclient().audio.speech.with_streaming_response.create(**kwargs) as response:
+            await response.stream_to_file(output_file)
+
 def read_settings():
     try:
-        with open('settings.json', 'r') as file:
-            return json.load(file)
+        return orjson.loads(Path('settings.json').read_bytes())
     except FileNotFoundError:
         print("settings.json file not found.")
         return None
 
-settings = read_settings()
-if settings is None:
-    exit(1)
+@functools.lru_cache(maxsize=1)
+def get_settings():
+    settings = read_settings()
+    if settings is None:
+        exit(1)
+    return settings
+
+# Rate limits discovered by probe_rate_limits, keyed like the settings entries
+probed_limits = {}
+
+def probe_rate_limits():
+    # A single 1-token probe fetches the key's current rate-limit headers, so
+    # a run with a rejected key fails immediately instead of minutes in and
+    # the client-side limiters can match the actual account tier. The headers
+    # are per-model pool, so probe the model the parallel fan-out will use.
+    try:
+        probe = get_client().chat.completions.with_raw_response.create(
+            model=get_settings().get('prompt_model', 'gpt-4o-mini'),
+            messages=[{"role": "user", "content": "."}],
+            max_tokens=1
+        )
+    except openai.AuthenticationError as e:
+        print(f"Error: OpenAI API key was rejected: {e}")
+        exit(1)
+    except Exception as e:
+        print(f"Could not probe account rate limits: {e}")
+        return
+
+    for settings_key, header in (('max_requests_per_minute', 'x-ratelimit-limit-requests'),
+                                 ('max_tokens_per_minute', 'x-ratelimit-limit-tokens')):
+        value = probe.headers.get(header)
+        if value:
+            probed_limits[settings_key] = int(value)
+
+    if probed_limits:
+        print_green_bold(f"Account rate limits: {probed_limits.get('max_requests_per_minute', '?')} requests/min, {probed_limits.get('max_tokens_per_minute', '?')} tokens/min")
+
+# Client-side token buckets so parallel requests pace themselves under the
+# account's rate limits instead of bursting into 429s and retry storms.
+# The configured settings act as a ceiling on whatever the probe discovered.
+@functools.lru_cache(maxsize=1)
+def get_rpm_limiter():
+    from aiolimiter import AsyncLimiter
+    limit = min(get_settings().get('max_requests_per_minute', 60),
+                probed_limits.get('max_requests_per_minute', float('inf')))
+    return AsyncLimiter(limit, 60)
+
+@functools.lru_cache(maxsize=1)
+def get_tpm_limiter():
+    from aiolimiter import AsyncLimiter
+    limit = min(get_settings().get('max_tokens_per_minute', 60000),
+                probed_limits.get('max_tokens_per_minute', float('inf')))
+    return AsyncLimiter(limit, 60)
+
+@functools.lru_cache(maxsize=1)
+def get_token_encoding():
+    import tiktoken
+    return tiktoken.encoding_for_model("gpt-4")
+
+def estimate_tokens(messages):
+    encoding = get_token_encoding()
+    return sum(len(encoding.encode(message["content"])) for message in messages)
 
 def generate_text_with_openai():
-    user_message = settings.get('user_message', '')
+    user_message = get_settings().get('user_message', '')
+    messages = [TEXT_SYSTEM_MESSAGE, {"role": "user", "content": user_message}]
+    text_model = get_settings().get('text_model', 'gpt-4o')
+
+    key = cache_key(text_model, messages)
+    cached_text = get_prompt_cache().get(key)
+    if cached_text is not None:
+        print_green_bold("Using cached text for this user message.")
+        return cached_text
+
     try:
-        response = client.chat.completions.create(model="gpt-4-1106-preview",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant which is able to generate guided meditations as text."},
-            {"role": "user", "content": user_message}
-        ],
-        )
-        return response.choices[0].message.content.strip()
+        response = create_chat_completion(model=text_model, messages=messages)
+        text = response.choices[0].message.content.strip()
+        get_prompt_cache().set(key, text)
+        return text
     except Exception as e:
         print(f"Error while generating text with OpenAI: {e}")
         return None
 
-def save_generated_text(text):
-    text_output_file = settings.get('text_output_file', 'text_output.txt')
+def save_generated_text(text, text_output_file):
     with open(text_output_file, 'w') as file:
         file.write(text)
 
-def ask_user_for_text_generation():
+def ask_user_for_text_generation(args):
+    if args.yes:
+        return True
     response = input("Do you want to generate text? [Y/n]: ").strip().lower()
     return response in ['', 'y', 'yes']
 
-def ask_user_for_text_to_speech_transformation():
+def ask_user_for_text_to_speech_transformation(args):
+    if args.skip_tts:
+        return False
+    if args.yes:
+        return True
     response = input("Do you want to proceed with Text-to-Speech transformation? [Y/n]: ").strip().lower()
     return response in ['', 'y', 'yes']
 
-def perform_text_to_speech_transformation(text_file):
+def split_text_into_chunks(text, max_chars=500):
+    # Split on sentence boundaries and group sentences into ~max_chars chunks
+    sentences = re.split(r'(?<=[.!?])\s+', text)
+    chunks = []
+    current_chunk = ''
+    for sentence in sentences:
+        if current_chunk and len(current_chunk) + len(sentence) + 1 > max_chars:
+            chunks.append(current_chunk)
+            current_chunk = sentence
+        else:
+            current_chunk = f"{current_chunk} {sentence}".strip()
+    if current_chunk:
+        chunks.append(current_chunk)
+    return chunks
+
+async def synthesize_speech_chunks(text, mp3_output_file):
+    chunks = split_text_into_chunks(text)
+
+    # Short texts fit in one request, no need for chunking overhead
+    if len(chunks) == 1:
+        await acreate_speech(mp3_output_file, model="tts-1", voice="nova", speed=0.75, input=text)
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        part_files = [os.path.join(temp_dir, f"part_{i}.mp3") for i in range(len(chunks))]
+
+        # Synthesize all chunks concurrently
+        await asyncio.gather(*[
+            acreate_speech(part_file, model="tts-1", voice="nova", speed=0.75, input=chunk)
+            for part_file, chunk in zip(part_files, chunks)
+        ])
+
+        # Concatenate the chunk MP3s losslessly with ffmpeg's concat demuxer
+        list_file = os.path.join(temp_dir, 'parts.txt')
+        with open(list_file, 'w') as file:
+            for part_file in part_files:
+                file.write(f"file '{part_file}'\n")
+        subprocess.run(
+            ['ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', list_file, '-c', 'copy', mp3_output_file],
+            check=True, capture_output=True
+        )
+
+async def perform_text_to_speech_transformation_async(text_file):
     try:
-        with open(text_file, 'r') as file:
-            text = file.read()
-            
-            mp3_output_file = text_file.replace('.txt', '.mp3')
-            response = client.audio.speech.create(
-                model="tts-1",
-                voice="nova",
-                speed=0.75,
-                input=text
-            )
-            response.stream_to_file(mp3_output_file)
-            print_green_bold(f"Text-to-Speech output written to file {mp3_output_file}.")
+        text = Path(text_file).read_text()
+
+        mp3_output_file = str(Path(text_file).with_suffix('.mp3'))
+        await synthesize_speech_chunks(text, mp3_output_file)
+        print_green_bold(f"Text-to-Speech output written to file {mp3_output_file}.")
+        return True
 
     except Exception as e:
         print(f"Error during Text-to-Speech transformation: {e}")
+        return False
 
-def ask_user_for_image_generation():
+def ask_user_for_image_generation(args):
+    if args.skip_images:
+        return False
+    if args.yes:
+        return True
     response = input("Do you want to start the image generation process? [Y/n]: ").strip().lower()
     return response in ['', 'y', 'yes']
 
-def generate_image_prompts(text, num_prompts):
-    prompts = []
+async def generate_image_prompts(text, num_prompts):
+    messages = [PROMPT_SYSTEM_MESSAGE, {"role": "user", "content": text}]
+
+    # Prompt rewriting is a simple style-transfer task, so a lighter model is
+    # plenty: cheaper, faster and with far higher rate limits than gpt-4
+    prompt_model = get_settings().get('prompt_model', 'gpt-4o-mini')
+
+    key = cache_key(prompt_model, messages, temperature=1.4, n=num_prompts)
+    cached_prompts = get_prompt_cache().get(key)
+    if cached_prompts is not None:
+        print_green_bold("Using cached image prompts for this text.")
+        return cached_prompts
+
     try:
-        for _ in range(num_prompts):
-            response = client.chat.completions.create(
-                model="gpt-4-1106-preview",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant who is able to generate perfect DallE 3 image generation prompts. Those prompts should be perfect for generating images to accompany the spoken text in a video. Images must not contain any humans or animals. Images must also not contain any writing. Please only output the prompt for the text the user is providing. Please do not include any further instructions or explainations in your answer, only the prompt text."},
-                    {"role": "user", "content": text}
-                ],
-                temperature=1.4
-            )
-            prompt = response.choices[0].message.content.strip()
-            prompts.append(prompt)
+        # A single request with n=num_prompts returns all variants at once:
+        # the shared input tokens are only billed once and only one
+        # rate-limit slot and network round trip are consumed.
+        response = await acreate_chat_completion(
+            model=prompt_model,
+            messages=messages,
+            temperature=1.4,
+            n=num_prompts
+        )
+        prompts = [choice.message.content.strip() for choice in response.choices]
+        get_prompt_cache().set(key, prompts)
+        return prompts
     except Exception as e:
         print(f"Error while generating image prompts with OpenAI: {e}")
-    
-    return prompts
+        return []
+
+def generate_image_prompts_batch(text, num_prompts):
+    try:
+        # Write one chat completion request per prompt into a JSONL batch
+        # input file; it only exists to be uploaded, so keep it in a temp dir
+        with tempfile.TemporaryDirectory() as temp_dir:
+            batch_input_file = os.path.join(temp_dir, 'batch_requests.jsonl')
+            with open(batch_input_file, 'wb') as file:
+                for i in range(num_prompts):
+                    request = {
+                        "custom_id": f"prompt-{i}",
+                        "method": "POST",
+                        "url": "/v1/chat/completions",
+                        "body": {
+                            "model": get_settings().get('prompt_model', 'gpt-4o-mini'),
+                            "messages": [PROMPT_SYSTEM_MESSAGE, {"role": "user", "content": text}],
+                            "temperature": 1.4
+                        }
+                    }
+                    file.write(orjson.dumps(request))
+                    file.write(b'\n')
+
+            # Upload the input file and submit the batch job
+            with open(batch_input_file, 'rb') as file:
+                input_file = get_client().files.create(file=file, purpose="batch")
+        batch = get_client().batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        print_green_bold(f"Batch job {batch.id} submitted. Waiting for completion...")
+
+        # Poll with exponential backoff until the batch job finishes
+        wait_seconds = 10
+        while True:
+            batch = get_client().batches.retrieve(batch.id)
+            if batch.status == "completed":
+                break
+            if batch.status in ("failed", "expired", "cancelled"):
+                print(f"Batch job {batch.id} ended with status: {batch.status}")
+                return []
+            time.sleep(wait_seconds)
+            wait_seconds = min(wait_seconds * 2, 300)
+
+        # Parse one prompt per result line from the batch output file
+        output = get_client().files.content(batch.output_file_id)
+        prompts = []
+        for line in output.text.splitlines():
+            result = orjson.loads(line)
+            prompt = result["response"]["body"]["choices"][0]["message"]["content"].strip()
+            prompts.append(prompt)
+        return prompts
 
-def generate_and_save_images(prompts, image_output_folder):
+    except Exception as e:
+        print(f"Error while generating image prompts via the Batch API: {e}")
+        return []
+
+async def generate_and_save_images(prompts, image_output_folder, max_concurrency=4):
     # Empty the image output folder first
     empty_directory(image_output_folder)
-   
-    for i, prompt in enumerate(prompts, 1):
-        try:
-            response = client.images.generate(
+
+    # Bound the number of in-flight generation requests to stay under the image rate limit
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def generate_and_save_single_image(i, prompt):
+        async with semaphore:
+            # b64_json embeds the PNG bytes in the generation response, so
+            # there is no second round trip against the image CDN
+            response = await agenerate_image(
                 model="dall-e-3",
                 prompt=prompt,
                 size="1792x1024",
                 quality="hd",
                 n=1,
+                response_format="b64_json",
             )
-            # Assuming the API returns the image URL
-            image_url = response.data[0].url
+        image_data = base64.b64decode(response.data[0].b64_json)
 
-            # Call download_image function
-            image_file_path = os.path.join(image_output_folder, f"image_{i}.png")
-            download_image(image_url, image_file_path)
+        image_file_path = os.path.join(image_output_folder, f"image_{i}.png")
+        async with aiofiles.open(image_file_path, 'wb') as file:
+            await file.write(image_data)
 
-            print_green_bold(f"Image {i} generated and saved in {image_output_folder}")
+        print_green_bold(f"Image {i} generated and saved in {image_output_folder}")
 
+    async def run_single_image(i, prompt):
+        try:
+            await generate_and_save_single_image(i, prompt)
+            return i, None
+        except Exception as e:
+            return i, e
+
+    # as_completed reports every image the moment it finishes, so the
+    # user sees progress throughout the fan-out instead of one long stall
+    tasks = [asyncio.create_task(run_single_image(i, prompt)) for i, prompt in enumerate(prompts, 1)]
+    failed = []
+    with tqdm(total=len(tasks), desc="Generating images", unit="image") as progress:
+        for finished in asyncio.as_completed(tasks):
+            i, error = await finished
+            if error is not None:
+                print(f"Error during image generation for prompt {i}: {error}")
+                failed.append(i)
+            progress.update(1)
+
+    # One final retry pass over the failures before giving up on them
+    for i in failed:
+        try:
+            await generate_and_save_single_image(i, prompts[i - 1])
         except Exception as e:
-            print(f"Error during image generation for prompt {i}: {e}")
+            print(f"Image {i} failed again, giving up: {e}")
 
-def download_image(image_url, file_path):
-    try:
-        response = requests.get(image_url)
+async def prompt_and_image_pipeline(text_content, num_images, image_output_folder, use_batch):
+    if use_batch:
+        print_green_bold("Using the OpenAI Batch API for prompt generation (50% cheaper, may take longer).")
+        # The Batch API path is synchronous polling, so run it in a worker thread
+        image_prompts = await asyncio.to_thread(generate_image_prompts_batch, text_content, num_images)
+    else:
+        image_prompts = await generate_image_prompts(text_content, num_images)
+
+    # Output image prompts array to the console
+    print_green_bold("Generated Image Prompts:")
+    for i, prompt in enumerate(image_prompts, 1):
+        print(f"Prompt {i}: {prompt}")
+
+    # Generate and save images
+    await generate_and_save_images(image_prompts, image_output_folder)
+
+@retry_on_transient_errors
+def fetch_image_to_file(image_url, file_path):
+    with get_http_session().get(image_url, stream=True, timeout=30) as response:
+        if response.status_code == 429:
+            # Honor the server-provided delay before tenacity's next backoff
+            # wait; the header may also be an HTTP-date, which we just skip
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    time.sleep(float(retry_after))
+                except ValueError:
+                    pass
         response.raise_for_status()
 
+        # Stream the body to disk in 64 KiB chunks instead of buffering it
         with open(file_path, 'wb') as file:
-            file.write(response.content)
+            for chunk in response.iter_content(65536):
+                file.write(chunk)
 
+def download_image(image_url, file_path):
+    try:
+        fetch_image_to_file(image_url, file_path)
         print_green_bold(f"Image downloaded and saved to {file_path}")
     except requests.exceptions.RequestException as e:
         print(f"Error downloading image: {e}")
 
 def empty_directory(folder_path):
-    for item in os.listdir(folder_path):
-        item_path = os.path.join(folder_path, item)
-        if os.path.isfile(item_path):
-            os.remove(item_path)
-        elif os.path.isdir(item_path):
-            shutil.rmtree(item_path)
-
-def ask_user_for_video_generation():
+    # scandir DirEntry objects already know their type, saving a stat call
+    # per entry; removals are I/O-bound syscalls so fan them out to threads
+    futures = []
+    with os.scandir(folder_path) as entries, ThreadPoolExecutor(max_workers=16) as pool:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False):
+                futures.append(pool.submit(os.remove, entry.path))
+            elif entry.is_dir(follow_symlinks=False):
+                futures.append(pool.submit(shutil.rmtree, entry.path))
+    # Re-raise any deletion failure; a stale image left behind would be
+    # silently stitched into the next video
+    for future in futures:
+        future.result()
+
+def ask_user_for_video_generation(args):
+    if args.yes:
+        return True
     response = input("Do you want to start the video generation process? [Y/n]: ").strip().lower()
     return response in ['', 'y', 'yes']
 
 def create_animated_clip(img_path, duration, zoom_intensity):
+    from moviepy.editor import ImageClip
+
     # Create a clip from an image with zoom-in and zoom-out effect
     clip = ImageClip(img_path).resize(height=1080)  # Resize for consistency
     clip = clip.set_duration(duration)
@@ -170,6 +505,8 @@ def create_animated_clip(img_path, duration, zoom_intensity):
     return clip
 
 def generate_video(images_folder, audio_file, music_file, output_file, total_duration, zoom_intensity, transition_time):
+    from moviepy.editor import concatenate_audioclips, concatenate_videoclips, AudioFileClip, CompositeAudioClip, AudioClip
+
     # Load all images and create animated clips
     image_files = [os.path.join(images_folder, f) for f in sorted(os.listdir(images_folder)) if f.endswith('.png')]
     duration_per_image = total_duration / len(image_files)
@@ -205,32 +542,31 @@ def generate_video(images_folder, audio_file, music_file, output_file, total_dur
     # Write the final video file
     final_video.write_videofile(output_file, fps=24)
 
-def ask_user_for_youtube_upload():
+def ask_user_for_youtube_upload(args):
+    if args.skip_upload:
+        return False
+    if args.yes:
+        return True
     response = input("Do you want to automatically upload the generated video to YouTube? [Y/n]: ").strip().lower()
     return response in ['', 'y', 'yes']
 
 # Function to handle preparation for YouTube video upload
 def upload_video_to_youtube(video_file_path, video_text):
-    generate_video_details = ask_for_video_details_generation()
-    video_details_file = args.video_details_file if args.video_details_file else settings.get('video_details_file', 'video_details.json')
+    generate_video_details = ask_for_video_details_generation(args)
+    video_details_file = args.video_details_file if args.video_details_file else get_settings().get('video_details_file', 'video_details.json')
 
     if generate_video_details:
         # Generate video details (title, description, keywords)
         # Use OpenAI Chat Completion API to generate video details
         try:
-            system_message = "You are an assistant which is able to generate for a given text of a YouTube video great seo-optimized and engaging video title (title), video description (description) and keywords (keywords). Please output in JSON format only."
-
-            completion = client.chat.completions.create(
+            completion = create_chat_completion(
                 model="gpt-3.5-turbo-1106",
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": video_text}
-                ],
+                messages=[VIDEO_DETAILS_SYSTEM_MESSAGE, {"role": "user", "content": video_text}],
                 response_format={"type": "json_object"}
             )
 
             video_details_str = completion.choices[0].message.content
-            video_details = json.loads(video_details_str)  # Converting string to JSON object
+            video_details = orjson.loads(video_details_str)  # Converting string to JSON object
 
             if 'title' in video_details and 'description' in video_details and 'keywords' in video_details:
                 # Convert comma-separated keywords string to a list
@@ -240,8 +576,8 @@ def upload_video_to_youtube(video_file_path, video_text):
                 video_details['keywords'] = keywords_list
 
                 # Write updated video details to the file
-                with open(video_details_file, 'w') as file:
-                    json.dump(video_details, file, indent=4)
+                with open(video_details_file, 'wb') as file:
+                    file.write(orjson.dumps(video_details, option=orjson.OPT_INDENT_2))
 
                 print(f"New video details written to {video_details_file}")
 
@@ -285,6 +621,7 @@ def upload_video_to_youtube(video_file_path, video_text):
     print("-------------------------------")
 
     print_green_bold("Uploading to YouTube...")
+    from youtube_uploader import upload_video
     category = "22"  # Category ID (e.g., "22" for People & Blogs)
     tags = keywords
 
@@ -292,22 +629,36 @@ def upload_video_to_youtube(video_file_path, video_text):
     upload_response = upload_video(video_file_path, title, description, category, tags)
     print_green_bold(f"Video uploaded successfully: {upload_response.get('id')}")
 
-def ask_for_video_details_generation():
+def ask_for_video_details_generation(args):
+    if args.yes:
+        return True
     response = input("Do you want to generate video title, description, and keywords? [Y/n]: ").strip().lower()
     return response in ['', 'y', 'yes']
 
 def read_video_details(file_path):
     try:
-        with open(file_path, 'r') as file:
-            return json.load(file)
+        return orjson.loads(Path(file_path).read_bytes())
     except Exception as e:
         print(f"Error reading video details file: {e}")
         return None
 
 def main(args):
-    # Determine the music file to use
+    settings = get_settings()
+
+    # Fail fast on a bad key and size the limiters before any long stage runs
+    probe_rate_limits()
+
+    # Resolve every argument/settings fallback once up front so the rest of
+    # main works with plain locals and repeated lookups cannot disagree
     music_file = args.music_file if args.music_file else settings.get('default_music_file')
-    
+    text_output_file = args.text_file if args.text_file else settings.get('text_output_file', 'text_output.txt')
+    image_output_folder = args.image_output_folder if args.image_output_folder else settings.get('default_image_output_folder', 'image_output')
+    video_output_file = args.output_file if args.output_file else settings.get('default_output_file')
+    max_num_images = settings.get('max_num_images', 5)
+    num_images = min(args.num_images if args.num_images else settings.get('default_num_images', 5), max_num_images)
+    zoom_intensity = settings.get('zoom_intensity', 0.05)
+    transition_time = settings.get('transition_time', 1)
+
     # Check if the music file exists
     if music_file and os.path.exists(music_file):
         print_green_bold(f"Background music file to be used: {music_file}")
@@ -318,56 +669,49 @@ def main(args):
     text_file_available = False
     mp3_file_exists = False
 
-    # Determine the text output file
-    text_output_file = args.text_file if args.text_file else settings.get('text_output_file', 'text_output.txt')
-
     # Check if the text file exists
     if os.path.exists(text_output_file):
         print_green_bold(f"Using existing text file: {text_output_file}")
         text_file_available = True
     else:
-        if ask_user_for_text_generation():
+        if ask_user_for_text_generation(args):
             print_green_bold("Generating text using OpenAI.")
             generated_text = generate_text_with_openai()
             if generated_text:
-                save_generated_text(generated_text)
+                save_generated_text(generated_text, text_output_file)
                 text_file_available = True
         else:
             print("Text generation skipped.")
     
 
     # Check if corresponding MP3 file exists or generate new MP3
-    mp3_output_file = text_output_file.replace('.txt', '.mp3')
+    mp3_output_file = str(Path(text_output_file).with_suffix('.mp3'))
     
-    # Check if the MP3 file exists
+    # Check if the MP3 file exists; the actual synthesis is deferred so it
+    # can run overlapped with the image pipeline below
+    run_tts = False
     if os.path.exists(mp3_output_file):
         print_green_bold(f"Corresponding voice MP3 file found: {mp3_output_file}. It will be used.")
         mp3_file_exists = True
     elif text_file_available:
-        if ask_user_for_text_to_speech_transformation():
+        if ask_user_for_text_to_speech_transformation(args):
             print_green_bold("Text-to-Speech transformation selected.")
-            perform_text_to_speech_transformation(text_output_file)
-            mp3_file_exists = True
+            run_tts = True
         else:
             print("Text-to-Speech transformation skipped.")
 
     # Image output folder handling
-    image_output_folder = args.image_output_folder if args.image_output_folder else settings.get('default_image_output_folder', 'image_output')
     print_green_bold(f"Images will be saved in the folder: {image_output_folder}")
 
     # Ensure the output folder exists
     os.makedirs(image_output_folder, exist_ok=True)
 
     # Ask user for image generation
-    if ask_user_for_image_generation():
+    run_images = ask_user_for_image_generation(args)
+    text_content = None
+    if run_images:
         print_green_bold("Image generation process selected.")
 
-        # Read the maximum number of images from settings
-        max_num_images = settings.get('max_num_images', 5)
-
-        # Determine the actual number of images to generate
-        num_images = min(args.num_images if args.num_images else settings.get('default_num_images', 5), max_num_images)
-
         # Read the text from the output file
         try:
             with open(text_output_file, 'r') as file:
@@ -375,25 +719,28 @@ def main(args):
         except FileNotFoundError:
             print(f"Error: Text output file {text_output_file} not found.")
             return
-
-        image_prompts = generate_image_prompts(text_content, num_images)
-        
-        # Output image prompts array to the console
-        print_green_bold("Generated Image Prompts:")
-        for i, prompt in enumerate(image_prompts, 1):
-            print(f"Prompt {i}: {prompt}")
-        
-        # Generate and save images
-        generate_and_save_images(image_prompts, image_output_folder)
     else:
         print("Image generation process skipped.")
 
+    # TTS and the prompt/image pipeline both only need the text, so run
+    # them concurrently instead of back to back
+    stages = []
+    if run_tts:
+        stages.append(perform_text_to_speech_transformation_async(text_output_file))
+    if run_images:
+        stages.append(prompt_and_image_pipeline(text_content, num_images, image_output_folder, args.batch))
+    if stages:
+        async def run_stages():
+            return await asyncio.gather(*stages)
+        stage_results = asyncio.run(run_stages())
+        if run_tts:
+            # The TTS stage is always first; only use its MP3 if it succeeded
+            mp3_file_exists = bool(stage_results[0])
+
     # Ask user if video generation should be started
-    if ask_user_for_video_generation():
+    if ask_user_for_video_generation(args):
         print_green_bold("Video generation process selected.")
 
-        # Determine the video output file
-        video_output_file = args.output_file if args.output_file else settings.get('default_output_file')
         if video_output_file:
             print_green_bold(f"Video output file to be used: {video_output_file}")
         else:
@@ -402,17 +749,14 @@ def main(args):
 
         print(f"Text File Available: {text_file_available}, MP3 File Exists: {mp3_file_exists}")
 
-        # Read zoom intensity and transition time from settings
-        zoom_intensity = settings.get('zoom_intensity', 0.05)  # Default value if not specified
-        transition_time = settings.get('transition_time', 1)   # Default value if not specified
-
         # Video generation
         if text_file_available and mp3_file_exists:
             try:
+                from moviepy.editor import AudioFileClip
                 generate_video(image_output_folder, mp3_output_file, music_file, video_output_file, AudioFileClip(mp3_output_file).duration, zoom_intensity, transition_time)
                 print("Video generation completed successfully.")
 
-                if ask_user_for_youtube_upload():
+                if ask_user_for_youtube_upload(args):
                     # Read the text from the output file
                     try:
                         with open(text_output_file, 'r') as file:
@@ -430,10 +774,9 @@ def main(args):
             print("Skipping video generation due to missing text or MP3 file.")
     else:
         # Check if the video file exists for YouTube upload
-        video_output_file = args.output_file if args.output_file else settings.get('default_output_file')
         if os.path.exists(video_output_file):
             print_green_bold(f"Found existing video file: {video_output_file}")
-            if ask_user_for_youtube_upload():
+            if ask_user_for_youtube_upload(args):
                 # Read the text from the output file
                 try:
                     with open(text_output_file, 'r') as file:
@@ -453,11 +796,16 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='PyAIVidGen: A tool to generate YouTube videos using AI')
 
     parser.add_argument('-t', '--text-file', type=str, help='Path to the text file (txt) for voice conversion', required=False)
-    parser.add_argument('-m', '--music-file', type=str, help='Path to the background music file (mp3)', default=settings.get('default_music_file'))
-    parser.add_argument('-n', '--num-images', type=int, help='Number of images to be generated', default=settings.get('default_num_images', 5))
-    parser.add_argument('-i', '--image-output-folder', type=str, help='Path for the folder where images will be saved', default=settings.get('default_image_output_folder', 'image_output'))
-    parser.add_argument('-o', '--output-file', type=str, help='Path for the output video file', default=settings.get('default_output_file'))
+    parser.add_argument('-m', '--music-file', type=str, help='Path to the background music file (mp3)', required=False)
+    parser.add_argument('-n', '--num-images', type=int, help='Number of images to be generated', required=False)
+    parser.add_argument('-i', '--image-output-folder', type=str, help='Path for the folder where images will be saved', required=False)
+    parser.add_argument('-o', '--output-file', type=str, help='Path for the output video file', required=False)
     parser.add_argument('-v', '--video-details-file', type=str, help='Path to the video details JSON file', required=False)
+    parser.add_argument('-b', '--batch', action='store_true', help='Generate image prompts via the OpenAI Batch API (50%% cheaper, completion within 24h)')
+    parser.add_argument('-y', '--yes', action='store_true', help='Assume yes to all prompts and run non-interactively')
+    parser.add_argument('--skip-tts', action='store_true', help='Skip the Text-to-Speech transformation')
+    parser.add_argument('--skip-images', action='store_true', help='Skip the image generation process')
+    parser.add_argument('--skip-upload', action='store_true', help='Skip the YouTube upload')
 
     args = parser.parse_args()
     main(args)